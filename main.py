@@ -3,10 +3,12 @@
 
 import os
 import json
+import functools
+import multiprocessing
+import numba
 import numpy as np
-import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
 import pandas as pd
-from scipy.signal import butter, filtfilt
 from scipy import interpolate
 import sys
 
@@ -22,11 +24,59 @@ data_WD = os.getcwd()
 os.chdir(ROOT)
 
 FOLDER = "GaitData"
-CODE_LIST = [filename.replace("_lf.txt", "") for filename in os.listdir(FOLDER) if filename.endswith("_lf.txt")]
+CODE_LIST = [entry.name[:-len("_lf.txt")] for entry in os.scandir(FOLDER) if entry.name.endswith("_lf.txt")]
 
 COLUMN_NAMES = {'TOX': 1, 'TAX': 2, 'TAY': 3, 'RAV': 4, 'RAZ': 5, 'RRY': 6, 'LAV': 7, 'LAZ': 8, 'LRY': 9}
 
 
+def _norm3(mat):
+    """Row-wise Euclidean norm of an (N, 3) acceleration matrix.
+
+    The einsum contraction fuses the three squares and two additions into
+    one pass, instead of allocating a temporary per squared axis.
+
+    Arguments:
+        mat {numpy array} -- (N, 3) matrix of axis components
+
+    Returns
+    -------
+    numpy array
+        (N,) vector of norms
+    """
+    return np.sqrt(np.einsum('ij,ij->i', mat, mat))
+
+
+@numba.njit("float32[::1](float32[::1])", cache=True, fastmath=True)
+def _compute_tox(gyr_x):
+    """Integrate the trunk Gyr_X channel and normalize it to [0, 180] degrees.
+
+    Fuses a cumulative trapezoidal integration, the two half-signal medians
+    and the final rescaling into a single pass over one output buffer.
+
+    Arguments:
+        gyr_x {numpy array} -- trunk gyration around X (deg/s, 100 Hz)
+
+    Returns
+    -------
+    numpy array
+        normalized trunk angle
+    """
+    n = len(gyr_x)
+    out = np.empty(n, dtype=gyr_x.dtype)
+    s = 0.0  # float64 accumulator, arrays stay in the input precision
+    out[0] = 0.0
+    for i in range(1, n):
+        s += 0.5 * (gyr_x[i] + gyr_x[i - 1])
+        out[i] = s * 0.01
+    a = np.median(out[:n // 2])  # Tout début du signal
+    z = np.median(out[n // 2:])  # Fin du signal, en enlevant la toute fin qui posait
+    scale = np.sign(z) * 180.0 / abs(z)
+    for i in range(n):
+        out[i] = (out[i] - a) * scale
+    return out
+
+
+@functools.lru_cache(maxsize=None)
 def load_metadata(subject, trial):
     """Return the metadata dict for the given subject-trial.
 
@@ -57,14 +107,20 @@ def print_trial_info(metadata_dict):
         Metadata of the trial.
     """
 
+    # scalar metrics computed once, before any formatting
+    trial_start, trial_end = metadata_dict['TrialBoundaries']
+    walking_speed = round(2000/(trial_end - trial_start), 3)
+    u_start, u_end = metadata_dict['UTurnBoundaries']
+    u_turn_duration = (u_end - u_start)/100
+
     display_dict = {'Subject': "Subject: {Subject}".format(**metadata_dict),
                     'Trial': "Trial: {Trial}".format(**metadata_dict),
                     'Age': "Age (year): {Age}".format(**metadata_dict),
                     'Gender': "Gender: {Gender}".format(**metadata_dict),
                     'Height': "Height (cm): {Height}".format(**metadata_dict),
                     'Weight': "Weight (kg): {Weight}".format(**metadata_dict),
-                    'WalkingSpeed': "WalkingSpeed (m/s): {}".format(round(2000/(metadata_dict['TrialBoundaries'][1]-metadata_dict['TrialBoundaries'][0]), 3)),
-                    'UTurnDuration': "U-Turn Duration (s): {}".format((metadata_dict['UTurnBoundaries'][1]-metadata_dict['UTurnBoundaries'][0])/100),
+                    'WalkingSpeed': "WalkingSpeed (m/s): {}".format(walking_speed),
+                    'UTurnDuration': "U-Turn Duration (s): {}".format(u_turn_duration),
                     'LeftGaitCycles': '    - Left foot: {}'.format(len(metadata_dict['LeftFootEvents'])),
                     'RightGaitCycles': '    - Right foot: {}'.format(len(metadata_dict['RightFootEvents']))
                     }
@@ -96,17 +152,27 @@ def load_XSens(filename):
         signal
     """
     
-    signal = pd.read_csv(filename, delimiter="\t", skiprows=1, header=0)
-    signal["PacketCounter"] = (signal["PacketCounter"] - signal["PacketCounter"][0])/100  # conversion (sample to seconds)
-   
-    # interest signals centered on zero
-    signal["FreeAcc_X"] = signal["Acc_X"] - np.mean(signal["Acc_X"])
-    signal["FreeAcc_Y"] = signal["Acc_Y"] - np.mean(signal["Acc_Y"])
-    signal["FreeAcc_Z"] = signal["Acc_Z"] - np.mean(signal["Acc_Z"])
+    # fixed numeric schema: read the header line by hand and let np.loadtxt
+    # parse straight into a contiguous float buffer (no pandas type inference)
+    with open(filename) as f:
+        f.readline()  # acquisition frequency banner
+        names = f.readline().rstrip("\n").split("\t")
+    data = np.loadtxt(filename, skiprows=2, dtype=np.float32)
+    signal = pd.DataFrame(data, columns=names, copy=False)
+
+    # resample every channel at once on a regular packet grid (one vectorized
+    # interp1d call instead of one interpolation per column)
+    t = signal["PacketCounter"].to_numpy()
+    time = np.arange(int(t[0]), int(t[-1]) + 1, dtype=np.float32)
+    vals = interpolate.interp1d(t, signal.iloc[:, 1:].to_numpy(), axis=0,
+                                assume_sorted=True, copy=False)(time)
+    signal = pd.DataFrame(vals.astype(np.float32, copy=False), columns=signal.columns[1:], copy=False)
+    signal.insert(0, "PacketCounter", np.arange(len(time), dtype=np.float32)/100)  # conversion (sample to seconds)
 
     return signal
 
 
+@functools.lru_cache(maxsize=None)
 def load_signal(subject, trial):
     """Return the signal associated with the subject-trial pair.
 
@@ -126,26 +192,39 @@ def load_signal(subject, trial):
     signal_lf = load_XSens(fname+"_lf.txt")
     signal_rf = load_XSens(fname+"_rf.txt")
     
+    # trim once, then work on plain numpy views: no Series is boxed past
+    # this point
     t_max = min(len(signal_lb), len(signal_rf), len(signal_lf))
-    signal_lb = signal_lb[0:t_max]
-    signal_lf = signal_lf[0:t_max]
-    signal_rf = signal_rf[0:t_max]
+    cols = {name: dim for dim, name in enumerate(signal_lb.columns)}
+    lb = signal_lb.to_numpy()[:t_max]
+    lf = signal_lf.to_numpy()[:t_max]
+    rf = signal_rf.to_numpy()[:t_max]
 
     # TOX computation
-    gyr_x = signal_lb['Gyr_X']
-    angle_x_full = np.cumsum(gyr_x)/100
-    a = np.median(angle_x_full[0:len(angle_x_full) // 2])  # Tout début du signal
-    z = np.median(angle_x_full[len(angle_x_full) // 2:len(angle_x_full)])  # Fin du signal, en enlevant la toute fin qui posait
-    angle_x_full = np.sign(z)*(angle_x_full - a)*180/abs(z)
-    
-    sig = {'Time': signal_lb["PacketCounter"], 'TOX': angle_x_full, 'TAX': signal_lb["Acc_X"], 'TAY': signal_lb["Acc_Y"], 
-           'RAV': np.sqrt(signal_rf["FreeAcc_X"]**2 + signal_rf["FreeAcc_Y"]**2 + signal_rf["FreeAcc_Z"]**2), 
-           'RAZ': signal_rf["FreeAcc_Z"], 'RRY': signal_rf["Gyr_Y"], 
-           'LAV': np.sqrt(signal_lf["FreeAcc_X"]**2 + signal_lf["FreeAcc_Y"]**2 + signal_lf["FreeAcc_Z"]**2), 
-           'LAZ': signal_lf["FreeAcc_Z"], 'LRY': signal_lf["Gyr_Y"]}
-    
-    signal = pd.DataFrame(sig)
-    
+    angle_x_full = _compute_tox(np.ascontiguousarray(lb[:, cols['Gyr_X']]))
+
+    # foot accelerations centered on zero, demeaned over the retained samples
+    # only (the trunk file never needs them)
+    acc_cols = slice(cols['Acc_X'], cols['Acc_Z'] + 1)
+    free_rf = rf[:, acc_cols] - rf[:, acc_cols].mean(axis=0)
+    free_lf = lf[:, acc_cols] - lf[:, acc_cols].mean(axis=0)
+
+    # single contiguous (N, 10) buffer instead of a dict of Series, wrapped
+    # once in a DataFrame without copy
+    sig = np.empty((t_max, 1 + len(COLUMN_NAMES)), dtype=np.float32)
+    sig[:, 0] = lb[:, cols['PacketCounter']]
+    sig[:, COLUMN_NAMES['TOX']] = angle_x_full
+    sig[:, COLUMN_NAMES['TAX']] = lb[:, cols['Acc_X']]
+    sig[:, COLUMN_NAMES['TAY']] = lb[:, cols['Acc_Y']]
+    sig[:, COLUMN_NAMES['RAV']] = _norm3(free_rf)
+    sig[:, COLUMN_NAMES['RAZ']] = free_rf[:, 2]
+    sig[:, COLUMN_NAMES['RRY']] = rf[:, cols['Gyr_Y']]
+    sig[:, COLUMN_NAMES['LAV']] = _norm3(free_lf)
+    sig[:, COLUMN_NAMES['LAZ']] = free_lf[:, 2]
+    sig[:, COLUMN_NAMES['LRY']] = lf[:, cols['Gyr_Y']]
+
+    signal = pd.DataFrame(sig, columns=['Time'] + list(COLUMN_NAMES), copy=False)
+
     return signal
 
 
@@ -159,71 +238,129 @@ def dump_plot(signal, metadata_dict, to_plot=['TOX', 'TAX', 'TAY', 'RAV', 'RAZ',
     n_samples, _ = signal.shape
     tt = np.arange(n_samples) / 100
 
-    # get limits
-    acc_tronc = np.take(signal, indices=[COLUMN_NAMES[dim_name]
-                                   for dim_name in to_plot if dim_name[0:2] == "TA"], axis=1)
-    if acc_tronc.size > 0:
-        acc_tronc_ylim = [acc_tronc.min()-0.1, acc_tronc.max()+0.1]
-    
-    acc = np.take(signal, indices=[COLUMN_NAMES[dim_name]
-                                   for dim_name in to_plot if dim_name[1] == "A"], axis=1)
-    if acc.size > 0:
-        acc_ylim = [acc.min()-0.1, acc.max()+0.1]
-        
-    rot = np.take(signal, indices=[COLUMN_NAMES[dim_name]
-                                   for dim_name in to_plot if dim_name[1] == "R"], axis=1)
-    if rot.size > 0:
-        rot_ylim = [rot.min()-20, rot.max()+20]
-
-    for dim_name in to_plot:
-        fig, ax = plt.subplots(figsize=(10, 4))
-        # xlim
-        ax.set_xlim(0, n_samples/100)
-        # plot
-        dim = COLUMN_NAMES[dim_name]
-        ax.plot(tt, signal.iloc[:, dim])
-        
-        # number of yticks
-        plt.locator_params(axis='y', nbins=6)
-        # xlabel
-        xlabel = "Time (s)"
-        ax.set_xlabel(xlabel, fontdict={"size": 15})
-        # ylabel
-        ylabel = "m/s²" if dim_name[1] == "A" else "deg/s"
-        ax.set_ylabel(ylabel, fontdict={"size": 15})
-        for z in ax.get_yticklabels() + ax.get_xticklabels():
-            z.set_fontsize(12)
-        
-        ymin, ymax = ax.get_ylim()
-        
-        # seg annotations
-        u_start, u_end = metadata_dict["UTurnBoundaries"]
-        ax.vlines([u_start/100, u_end/100], ymin, ymax, color='red', linestyles="--", lw=1, label = 'U-turn Boundaries')
-        ax.fill_between([u_start/100, u_end/100], ymin, ymax,
-                        facecolor="red", alpha=0.2, label = "U-Turn Phase")
-        # step annotations
-        if dim_name[0] in ["R", "L"]:
-            if dim_name[0] == "R":
-                steps = metadata_dict["RightFootEvents"]
-            elif dim_name[0] == "L":
-                steps = metadata_dict["LeftFootEvents"]
-                
-            label_added =False
-            for start, end in steps:
-                if (end < u_start) | (start > u_end):
-                    if not label_added:
-                        ax.vlines([start/100, end/100], ymin, ymax, linestyles="--", lw=1, label = "Gait Events")
-                        r = ax.fill_between([start/100, end/100], ymin, ymax,
-                                        facecolor="green", alpha=0.3, label = "Swing Phases")
-                        label_added =True
-                    else:
-                        ax.vlines([start/100, end/100], ymin, ymax, linestyles="--", lw=1)
-                        r = ax.fill_between([start/100, end/100], ymin, ymax,
-                                        facecolor="green", alpha=0.3)
-        fig.tight_layout()
-        fig.legend(bbox_to_anchor=(1, 0.72, 0, 0.5))
-        plt.savefig(dim_name + ".svg", dpi=300,
-                    transparent=True, bbox_inches='tight')
+    # get limits: one column-wise min/max pass shared by the three groups
+    values = signal.to_numpy()
+    col_min = values.min(axis=0)
+    col_max = values.max(axis=0)
+
+    acc_tronc_dims = [COLUMN_NAMES[dim_name] for dim_name in to_plot if dim_name[0:2] == "TA"]
+    if acc_tronc_dims:
+        acc_tronc_ylim = [col_min[acc_tronc_dims].min()-0.1, col_max[acc_tronc_dims].max()+0.1]
+
+    acc_dims = [COLUMN_NAMES[dim_name] for dim_name in to_plot if dim_name[1] == "A"]
+    if acc_dims:
+        acc_ylim = [col_min[acc_dims].min()-0.1, col_max[acc_dims].max()+0.1]
+
+    rot_dims = [COLUMN_NAMES[dim_name] for dim_name in to_plot if dim_name[1] == "R"]
+    if rot_dims:
+        rot_ylim = [col_min[rot_dims].min()-20, col_max[rot_dims].max()+20]
+
+    # each SVG is independent: render them on a pool of workers
+    args = [(dim_name, signal.iloc[:, COLUMN_NAMES[dim_name]].to_numpy(), tt, metadata_dict)
+            for dim_name in to_plot]
+    with multiprocessing.Pool(min(len(to_plot), os.cpu_count())) as pool:
+        pool.starmap(_plot_dim, args)
+
+
+_MAX_PLOT_POINTS = 2000  # vertex budget per curve in the dumped SVGs
+
+
+def _decimate(tt, values, max_points=_MAX_PLOT_POINTS):
+    """Reduce a curve to at most max_points vertices before plotting.
+
+    Keeps the per-bucket minimum and maximum samples so the rendered
+    envelope is unchanged while the SVG stays small.
+
+    Arguments:
+        tt {numpy array} -- time vector (s)
+        values {numpy array} -- samples to plot
+        max_points {int} -- vertex budget (default: {_MAX_PLOT_POINTS})
+
+    Returns
+    -------
+    tuple of numpy arrays
+        decimated (tt, values)
+    """
+    n = len(values)
+    if n <= max_points:
+        return tt, values
+    edges = np.linspace(0, n, max_points // 2 + 1).astype(np.intp)
+    idx = np.empty((max_points // 2, 2), dtype=np.intp)
+    for k in range(len(edges) - 1):
+        lo, hi = edges[k], edges[k + 1]
+        i_min = lo + np.argmin(values[lo:hi])
+        i_max = lo + np.argmax(values[lo:hi])
+        idx[k] = sorted((i_min, i_max))
+    idx = idx.ravel()
+    return tt[idx], values[idx]
+
+
+_FIG = None  # per-process figure, reused by _plot_dim across dimensions
+
+
+def _plot_dim(dim_name, values, tt, metadata_dict):
+    """Render one dimension of the trial to <dim_name>.svg.
+
+    Runs in a worker process of dump_plot's pool, so it only receives
+    picklable arguments (column values as a numpy array). Uses the OO
+    matplotlib API on a single reused Figure per process instead of going
+    through the pyplot state machine and its figure registry.
+
+    Arguments:
+        dim_name {str} -- name of the dimension (key of COLUMN_NAMES)
+        values {numpy array} -- column of the signal to plot
+        tt {numpy array} -- time vector (s)
+        metadata_dict {dict} -- Metadata of the trial.
+    """
+    global _FIG
+    if _FIG is None:
+        _FIG = Figure(figsize=(10, 4))
+    fig = _FIG
+    fig.clear()
+    ax = fig.add_subplot()
+    # xlim
+    ax.set_xlim(0, len(tt)/100)
+    # plot
+    ax.plot(*_decimate(tt, values))
+
+    # number of yticks
+    ax.locator_params(axis='y', nbins=6)
+    # xlabel
+    xlabel = "Time (s)"
+    ax.set_xlabel(xlabel, fontdict={"size": 15})
+    # ylabel
+    ylabel = "m/s²" if dim_name[1] == "A" else "deg/s"
+    ax.set_ylabel(ylabel, fontdict={"size": 15})
+    for z in ax.get_yticklabels() + ax.get_xticklabels():
+        z.set_fontsize(12)
+
+    ymin, ymax = ax.get_ylim()
+
+    # seg annotations
+    u_start, u_end = metadata_dict["UTurnBoundaries"]
+    ax.vlines([u_start/100, u_end/100], ymin, ymax, color='red', linestyles="--", lw=1, label = 'U-turn Boundaries')
+    ax.fill_between([u_start/100, u_end/100], ymin, ymax,
+                    facecolor="red", alpha=0.2, label = "U-Turn Phase")
+    # step annotations
+    if dim_name[0] in ["R", "L"]:
+        if dim_name[0] == "R":
+            steps = metadata_dict["RightFootEvents"]
+        elif dim_name[0] == "L":
+            steps = metadata_dict["LeftFootEvents"]
+
+        # vectorized u-turn filter on an (n_steps, 2) array
+        steps = np.asarray(steps, dtype=np.float64).reshape(-1, 2)
+        steps = steps[(steps[:, 1] < u_start) | (steps[:, 0] > u_end)] / 100
+        if len(steps) > 0:
+            ax.vlines(steps.ravel(), ymin, ymax, linestyles="--", lw=1, label = "Gait Events")
+            for k, (start, end) in enumerate(steps):
+                r = ax.fill_between([start, end], ymin, ymax,
+                                facecolor="green", alpha=0.3,
+                                label = "Swing Phases" if k == 0 else None)
+    fig.tight_layout()
+    fig.legend(bbox_to_anchor=(1, 0.72, 0, 0.5))
+    fig.savefig(dim_name + ".svg", dpi=300,
+                transparent=True, bbox_inches='tight')
 
 
 if __name__ == "__main__":